@@ -15,8 +15,8 @@ data = meteoCocito.DataArchive.current()
 
 print(data)
 
-elenco = meteoCocito.DataArchive.betweenDatetimes(datetime.datetime(2022, 1, 1), datetime.datetime(2022, 2, 1))
+tabella = meteoCocito.DataArchive.betweenDatetimesTable(datetime.datetime(2022, 1, 1), datetime.datetime(2022, 2, 1))
 
-for valore in elenco:
-    if valore.symbol == meteoCocito.DataTypeArchive.Symbols.temperature:
-        print(valore.instant, float(valore))
+istanti, valori = tabella.select(meteoCocito.DataTypeArchive.Symbols.temperature)
+for istante, valore in zip(istanti, valori):
+    print(istante, valore)
@@ -1,19 +1,39 @@
 from __future__ import annotations
 
+import array
+import bisect
+import collections
+import concurrent.futures
 import datetime
-import glob
 import json
+import math
 import os
 import statistics
 from enum import Enum
+from typing import Iterator
 
 import pygit2 as pygit2
 
+try:
+    import orjson as _json
+except ImportError:
+    _json = json
+
+
+def _parse_ts(s: str) -> datetime.datetime:
+    """
+    Parse a "YYYY-MM-DD HH:MM:SS" timestamp by slicing, faster than strptime
+    :param s: The timestamp string
+    :return: The datetime
+    """
+    return datetime.datetime(int(s[0:4]), int(s[5:7]), int(s[8:10]), int(s[11:13]), int(s[14:16]), int(s[17:19]))
+
 
 class DataType:
     """
     DataType is a representation of a weather data type
     """
+    __slots__ = ("symbol", "unit", "fileName", "italianName", "precision")
 
     def __init__(self, symbol: str, unit: str, fileName: str, italianName: str, precision: int = 2):
         """
@@ -78,10 +98,7 @@ class DataTypeArchive:
         :param symbol: The symbol
         :return: The DataType
         """
-        for dataType in DataTypeArchive.data:
-            if dataType.symbol == symbol:
-                return dataType
-        return None
+        return _BY_SYMBOL.get(symbol)
 
     @staticmethod
     def fromUnit(unit: str) -> DataType | None:
@@ -90,10 +107,7 @@ class DataTypeArchive:
         :param unit: The Unit
         :return: The DataType
         """
-        for dataType in DataTypeArchive.data:
-            if dataType.unit == unit:
-                return dataType
-        return None
+        return _BY_UNIT.get(unit)
 
     @staticmethod
     def fromFileName(fileName: str) -> DataType | None:
@@ -102,10 +116,7 @@ class DataTypeArchive:
         :param fileName: The fileName
         :return: The DataType
         """
-        for dataType in DataTypeArchive.data:
-            if dataType.fileName == fileName:
-                return dataType
-        return None
+        return _BY_FILE_NAME.get(fileName)
 
     @staticmethod
     def fromItalianName(italianName: str) -> DataType | None:
@@ -114,22 +125,52 @@ class DataTypeArchive:
         :param italianName: The ItalianName
         :return: The DataType
         """
-        for dataType in DataTypeArchive.data:
-            if dataType.italianName == italianName:
-                return dataType
-        return None
+        return _BY_ITALIAN_NAME.get(italianName)
+
+
+# Lookup tables, built in reverse so that the first DataType wins on duplicate keys (e.g. units)
+_BY_SYMBOL = {dataType.symbol: dataType for dataType in reversed(DataTypeArchive.data)}
+_BY_UNIT = {dataType.unit: dataType for dataType in reversed(DataTypeArchive.data)}
+_BY_FILE_NAME = {dataType.fileName: dataType for dataType in reversed(DataTypeArchive.data)}
+_BY_ITALIAN_NAME = {dataType.italianName: dataType for dataType in reversed(DataTypeArchive.data)}
+_SYMBOLS = {symbol.value: symbol for symbol in DataTypeArchive.Symbols}
 
 
 class Value:
     """
     Stores a value, its datatype symbol and instant of acquisition
     """
+    __slots__ = ("value", "symbol", "instant")
 
     def __init__(self, value: float, symbol: DataTypeArchive.Symbols = DataTypeArchive.Symbols.temperature,
-                 instant: datetime.datetime = datetime.datetime.now()):
-        self.value = round(value, DataTypeArchive.fromSymbol(symbol.value).precision)
+                 instant: datetime.datetime | None = None, precision: int | None = None):
+        """
+        Construct a new 'Value' object.
+        :param value: The raw value
+        :param symbol: The datatype symbol
+        :param instant: The instant of acquisition, now when not given
+        :param precision: The rounding precision, looked up from the symbol when not given
+        """
+        if precision is None:
+            precision = DataTypeArchive.fromSymbol(symbol.value).precision
+        self.value = round(value, precision)
         self.symbol = symbol
-        self.instant = instant
+        self.instant = instant if instant is not None else datetime.datetime.now()
+
+    @staticmethod
+    def fromCsv(value: float, symbol: DataTypeArchive.Symbols, instant: datetime.datetime) -> Value:
+        """
+        Build a Value read from the data CSV files, which already store values at their precision, without rounding
+        :param value: The value as read from the CSV file
+        :param symbol: The datatype symbol
+        :param instant: The instant of acquisition
+        :return: The Value
+        """
+        v = object.__new__(Value)
+        v.value = value
+        v.symbol = symbol
+        v.instant = instant
+        return v
 
     def __int__(self) -> int:
         return int(self.value)
@@ -138,6 +179,83 @@ class Value:
         return self.value
 
 
+class ValueTable:
+    """
+    Stores values column by column (values and instants, one contiguous run per symbol) instead of one Value per row
+    """
+    __slots__ = ("values", "instants", "__ranges")
+
+    def __init__(self, columns: dict | None = None):
+        """
+        Construct a new 'ValueTable' object.
+        :param columns: a map from symbol to a tuple of instants and values columns
+        """
+        self.values = array.array("d")
+        self.instants = []
+        self.__ranges = {}
+        for symbol, (instants, values) in (columns or {}).items():
+            start = len(self.values)
+            self.values.extend(values)
+            self.instants.extend(instants)
+            self.__ranges[symbol] = (start, len(self.values))
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __iter__(self):
+        for symbol, (start, stop) in self.__ranges.items():
+            for i in range(start, stop):
+                yield Value.fromCsv(self.values[i], symbol, self.instants[i])
+
+    def select(self, symbol: DataTypeArchive.Symbols) -> tuple[list[datetime.datetime], array.array]:
+        """
+        Obtain the instants and values columns of a single symbol
+        :param symbol: The symbol
+        :return: a tuple of instants and values columns
+        """
+        start, stop = self.__ranges.get(symbol, (0, 0))
+        return self.instants[start:stop], self.values[start:stop]
+
+    def columns(self) -> dict[DataTypeArchive.Symbols, tuple[list[datetime.datetime], array.array]]:
+        """
+        Obtain the instants and values columns of every symbol
+        :return: a map from symbol to a tuple of instants and values columns
+        """
+        return {symbol: self.select(symbol) for symbol in self.__ranges}
+
+
+_repo_cache = None
+_repo_exists = None
+_head_oid = None
+_current_cache = (None, None)
+_CACHE_DIR = "dati_cache"
+_CACHE_VERSION = 2
+_cache_oid = None
+_month_memo = collections.OrderedDict()
+
+
+def _get_repo() -> pygit2.Repository:
+    """
+    Obtain the data repository, opening it only once per process
+    :return: The repository
+    """
+    global _repo_cache
+    if _repo_cache is None:
+        _repo_cache = pygit2.Repository("dati")
+    return _repo_cache
+
+
+def _has_repo() -> bool:
+    """
+    Check whether the data repository has been cloned, checking the filesystem only once per process
+    :return: True if dati/.git exists
+    """
+    global _repo_exists
+    if _repo_exists is None:
+        _repo_exists = os.path.isdir("dati/.git")
+    return _repo_exists
+
+
 class DataArchive:
 
 
@@ -148,8 +266,12 @@ class DataArchive:
         :return: None
         :except May rise connection exceptions
         """
-        if not os.path.isdir("dati/.git"):
-            pygit2.clone_repository("https://github.com/StazioneMeteoCocito/dati", "dati")
+        global _repo_cache, _repo_exists, _head_oid
+        if not _has_repo():
+            _repo_cache = pygit2.clone_repository("https://github.com/StazioneMeteoCocito/dati", "dati")
+            _repo_exists = True
+            _head_oid = str(_repo_cache.head.target)
+            _month_memo.clear()
         else:
             DataArchive.update()
 
@@ -183,10 +305,25 @@ class DataArchive:
         :return: None
         :except May rise connection exceptions
         """
-        if not os.path.isdir("dati/.git"):
+        global _head_oid
+        if not _has_repo():
             DataArchive.create()
         else:
-            DataArchive.__pull(pygit2.Repository("dati"))
+            repo = _get_repo()
+            DataArchive.__pull(repo)
+            _head_oid = str(repo.head.target)
+            _month_memo.clear()
+
+    @staticmethod
+    def headOid() -> str | None:
+        """
+        Obtain the commit id the data repository is at, read once and refreshed on update
+        :return: The hex commit id or None if the data has not been cloned
+        """
+        global _head_oid
+        if _head_oid is None and _has_repo():
+            _head_oid = str(_get_repo().head.target)
+        return _head_oid
 
     @staticmethod
     def report() -> str:
@@ -199,51 +336,319 @@ class DataArchive:
     @staticmethod
     def current() -> dict:
         """
-        Obtain the last data
+        Obtain the last data, parsed again only when dati/last.json changes
         """
-        with open("dati/last.json") as r:
-            return json.loads(r.read())
+        global _current_cache
+        mtime = os.stat("dati/last.json").st_mtime_ns
+        if _current_cache[0] != mtime:
+            with open("dati/last.json", "rb") as r:
+                _current_cache = (mtime, _json.loads(r.read()))
+        return dict(_current_cache[1])
 
     @staticmethod
-    def __lastPathElement(path: str) -> str:
+    def __readCsv(path: str, year: int, month: int, day: int, start: datetime.datetime, end: datetime.datetime) -> \
+            tuple[list[datetime.datetime], list[float]]:
+        """
+        Read the rows of a day CSV file falling between two datetimes, internal utility
+        :param path: The CSV file path
+        :param year: The year of the day directory
+        :param month: The month of the day directory
+        :param day: The day of the day directory
+        :param start: start datetime
+        :param end: end datetime
+        :return: a tuple of instants and values columns
+        """
+        instants = []
+        values = []
+        with open(path, "r") as f:
+            for line in f:
+                l = line.split(",")
+                if len(l) < 2:
+                    continue
+                ts = l[0]
+                dateT = datetime.datetime(year, month, day, int(ts[11:13]), int(ts[14:16]), int(ts[17:19]))
+                if start > dateT or end < dateT:  # It should not be necessary, but I guess
+                    continue
+                instants.append(dateT)
+                values.append(float(l[1]))
+        return instants, values
+
+    @staticmethod
+    def __dayFiles(start: datetime.datetime, end: datetime.datetime) -> \
+            list[tuple[str, DataTypeArchive.Symbols, int, int, int]]:
+        """
+        Walk the data tree and list the CSV files of the days between two datetimes, internal utility
+        :param start: start datetime
+        :param end: end datetime
+        :return: list of (path, symbol, year, month, day) tuples
+        """
+        files = []
+        startDay = (start.year, start.month, start.day)
+        endDay = (end.year, end.month, end.day)
+        for yEntry in os.scandir("dati"):
+            if not yEntry.name.startswith("2") or not yEntry.is_dir(follow_symlinks=False):
+                continue
+            year = int(yEntry.name)
+            if not start.year <= year <= end.year:
+                continue
+            for mEntry in os.scandir(yEntry.path):
+                if not mEntry.is_dir(follow_symlinks=False):
+                    continue
+                month = int(mEntry.name)
+                if not startDay[:2] <= (year, month) <= endDay[:2]:
+                    continue
+                for dEntry in os.scandir(mEntry.path):
+                    if not dEntry.is_dir(follow_symlinks=False):
+                        continue
+                    day = int(dEntry.name)
+                    if not startDay <= (year, month, day) <= endDay:
+                        continue
+                    for element in os.scandir(dEntry.path):
+                        if not element.name.endswith(".csv"):
+                            continue
+                        type = _SYMBOLS[DataTypeArchive.fromFileName(element.name).symbol]
+                        files.append((element.path, type, year, month, day))
+        return files
+
+    @staticmethod
+    def __readFiles(files: list[tuple[str, DataTypeArchive.Symbols, int, int, int]], start: datetime.datetime,
+                    end: datetime.datetime, workers: int = 1) -> \
+            dict[DataTypeArchive.Symbols, tuple[list[datetime.datetime], list[float]]]:
         """
-        Obtain the last element of a path
-        :param path: The path
-        :return: the last element
+        Read the rows of day CSV files falling between two datetimes, internal utility
+        :param files: list of (path, symbol, year, month, day) tuples
+        :param start: start datetime
+        :param end: end datetime
+        :param workers: The number of threads reading CSV files, 1 reads them sequentially
+        :return: a map from symbol to a tuple of instants and values columns
         """
-        return path.split("/")[-1]
+
+        def read(file: tuple[str, DataTypeArchive.Symbols, int, int, int]) -> \
+                tuple[DataTypeArchive.Symbols, tuple[list[datetime.datetime], list[float]]]:
+            path, type, year, month, day = file
+            return type, DataArchive.__readCsv(path, year, month, day, start, end)
+
+        columns = {}
+        if workers > 1:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(read, files))
+        else:
+            results = map(read, files)
+        for type, (instants, values) in results:
+            if type not in columns:
+                columns[type] = ([], [])
+            columns[type][0].extend(instants)
+            columns[type][1].extend(values)
+        return columns
 
     @staticmethod
-    def betweenDatetimes(start: datetime.datetime, end: datetime.datetime) -> list[Value]:
+    def __sortColumns(columns: dict[DataTypeArchive.Symbols, tuple[list[datetime.datetime], list[float]]]) -> \
+            dict[DataTypeArchive.Symbols, tuple[list[datetime.datetime], array.array]]:
+        """
+        Sort each symbol's instants and values columns by instant, internal utility
+        :param columns: a map from symbol to a tuple of instants and values columns
+        :return: a map from symbol to a tuple of sorted instants and values columns
+        """
+        sortedColumns = {}
+        for type, (instants, values) in columns.items():
+            order = sorted(range(len(instants)), key=instants.__getitem__)
+            sortedColumns[type] = ([instants[i] for i in order], array.array("d", [values[i] for i in order]))
+        return sortedColumns
+
+    @staticmethod
+    def __syncCache(headOid: str) -> None:
+        """
+        Drop the cached months touched by the commits made since the on-disk cache was written, internal utility
+        :param headOid: The data commit id
+        :return: None
+        """
+        global _cache_oid
+        oidPath = os.path.join(_CACHE_DIR, "head.json")
+        if not os.path.isfile(oidPath):
+            # No cache yet, or its directory was removed: it is created again from scratch
+            _cache_oid = None
+        elif _cache_oid == headOid:
+            return
+        elif _cache_oid is None:
+            try:
+                with open(oidPath) as f:
+                    head = json.load(f)
+                # A cache written in another format is dropped as a whole below
+                if head.get("version") == _CACHE_VERSION:
+                    _cache_oid = head.get("oid")
+            except (ValueError, AttributeError):
+                pass
+        if _cache_oid != headOid:
+            os.makedirs(_CACHE_DIR, exist_ok=True)
+            try:
+                if _cache_oid is None:
+                    raise KeyError(headOid)
+                stale = set()
+                for delta in _get_repo().diff(_cache_oid, headOid).deltas:
+                    for path in (delta.old_file.path, delta.new_file.path):
+                        parts = path.split("/")
+                        if len(parts) > 2 and parts[0].isdigit() and parts[1].isdigit():
+                            stale.add(parts[0].zfill(4) + "-" + parts[1].zfill(2) + ".json")
+            except (KeyError, ValueError, pygit2.GitError):
+                # Unknown cached commit, start over
+                stale = set(os.listdir(_CACHE_DIR)) - {"head.json"}
+            for name in stale:
+                try:
+                    os.remove(os.path.join(_CACHE_DIR, name))
+                except FileNotFoundError:
+                    pass
+            with open(oidPath, "w") as f:
+                json.dump({"oid": headOid, "version": _CACHE_VERSION}, f)
+            _cache_oid = headOid
+
+    @staticmethod
+    def __monthColumns(year: int, month: int, headOid: str | None, workers: int = 1) -> \
+            dict[DataTypeArchive.Symbols, tuple[list[datetime.datetime], array.array]]:
+        """
+        Obtain all values of a month sorted by instant, memoized per data commit for the last 12 months read.
+        Without a git clone nothing tells when the CSV files change, so the month is read again on every call
+        :param year: The year
+        :param month: The month
+        :param headOid: The data commit id, None if the data is not a git clone
+        :param workers: The number of threads reading CSV files, 1 reads them sequentially
+        :return: a map from symbol to a tuple of instants and values columns, not to be modified
+        """
+        if headOid is None:
+            start = datetime.datetime(year, month, 1)
+            end = (start + datetime.timedelta(days=32)).replace(day=1) - datetime.timedelta(microseconds=1)
+            return DataArchive.__sortColumns(
+                DataArchive.__readFiles(DataArchive.__dayFiles(start, end), start, end, workers))
+        # workers only changes how a month is read, so it is not part of the memoization key
+        key = (year, month, headOid)
+        if key in _month_memo:
+            _month_memo.move_to_end(key)
+            return _month_memo[key]
+        columns = DataArchive.__readCachedMonth(year, month, headOid, workers)
+        _month_memo[key] = columns
+        if len(_month_memo) > 12:
+            _month_memo.popitem(last=False)
+        return columns
+
+    @staticmethod
+    def __readCachedMonth(year: int, month: int, headOid: str, workers: int = 1) -> \
+            dict[DataTypeArchive.Symbols, tuple[list[datetime.datetime], array.array]]:
+        """
+        Obtain all values of a month of a git clone sorted by instant, through an on-disk cache kept in sync with
+        its commits: even read-only queries create and write the dati_cache directory in the working directory
+        :param year: The year
+        :param month: The month
+        :param headOid: The data commit id
+        :param workers: The number of threads reading CSV files, 1 reads them sequentially
+        :return: a map from symbol to a tuple of instants and values columns, not to be modified
+        """
+        start = datetime.datetime(year, month, 1)
+        end = (start + datetime.timedelta(days=32)).replace(day=1) - datetime.timedelta(microseconds=1)
+        # The on-disk cache is best effort: without write access the month is just parsed from the CSV files
+        # Plain data only: {symbol: [[ISO instants], [values]]}
+        path = os.path.join(_CACHE_DIR, str(year).zfill(4) + "-" + str(month).zfill(2) + ".json")
+        try:
+            DataArchive.__syncCache(headOid)
+            with open(path, "rb") as f:
+                return {_SYMBOLS[symbol]: ([datetime.datetime.fromisoformat(t) for t in instants],
+                                           array.array("d", values))
+                        for symbol, (instants, values) in _json.loads(f.read()).items()}
+        except (ValueError, KeyError, TypeError, AttributeError):
+            # Unreadable cache file, parse the month again
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        except OSError:
+            pass
+        columns = DataArchive.__sortColumns(
+            DataArchive.__readFiles(DataArchive.__dayFiles(start, end), start, end, workers))
+        try:
+            os.makedirs(_CACHE_DIR, exist_ok=True)
+            with open(path + ".tmp", "w") as f:
+                json.dump({type.value: [[t.isoformat() for t in instants], values.tolist()]
+                           for type, (instants, values) in columns.items()}, f, separators=(",", ":"))
+            os.replace(path + ".tmp", path)
+        except OSError:
+            pass
+        return columns
+
+    @staticmethod
+    def __columns(start: datetime.datetime, end: datetime.datetime, workers: int = 1) -> \
+            dict[DataTypeArchive.Symbols, tuple[list[datetime.datetime], list[float]]]:
+        """
+        Read all values between two datetimes, slicing the memoized months they span
+        :param start: start datetime
+        :param end: end datetime
+        :param workers: The number of threads reading CSV files, 1 reads them sequentially
+        :return: a map from symbol to a tuple of instants and values columns, sorted by instant
+        """
+        headOid = DataArchive.headOid()
+        columns = {}
+        year, month = start.year, start.month
+        while (year, month) <= (end.year, end.month):
+            if os.path.isdir(os.path.join("dati", str(year), str(month).zfill(2))):
+                for type, (instants, values) in DataArchive.__monthColumns(year, month, headOid, workers).items():
+                    i = bisect.bisect_left(instants, start)
+                    j = bisect.bisect_right(instants, end)
+                    if type not in columns:
+                        columns[type] = ([], [])
+                    columns[type][0].extend(instants[i:j])
+                    columns[type][1].extend(values[i:j])
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        return columns
+
+    @staticmethod
+    def betweenDatetimesColumns(start: datetime.datetime, end: datetime.datetime, workers: int = 1) -> \
+            dict[DataTypeArchive.Symbols, tuple[list[datetime.datetime], list[float]]]:
+        """
+        Obtain all values between two datetimes as columns, without building a Value for each row
+        :param start: start datetime
+        :param end: end datetime
+        :param workers: The number of threads reading CSV files, 1 reads them sequentially
+        :return: a map from symbol to a tuple of instants and values columns
+        """
+        return DataArchive.__columns(start, end, workers)
+
+    @staticmethod
+    def betweenDatetimesTable(start: datetime.datetime, end: datetime.datetime, workers: int = 1) -> ValueTable:
+        """
+        Obtain all values between two datetimes as a ValueTable
+        :param start: start datetime
+        :param end: end datetime
+        :param workers: The number of threads reading CSV files, 1 reads them sequentially
+        :return: The ValueTable
+        """
+        return ValueTable(DataArchive.__columns(start, end, workers))
+
+    @staticmethod
+    def iterBetweenDatetimes(start: datetime.datetime, end: datetime.datetime) -> Iterator[Value]:
+        """
+        Iterate over all values between two datetimes, reading one CSV file at a time.
+        Values come grouped by symbol, each symbol day by day in the order of its CSV rows
+        :param start: start datetime
+        :param end: end datetime
+        :return: iterator of Values
+        """
+        files = DataArchive.__dayFiles(start, end)
+        files.sort(key=lambda file: (file[1].value, file[2], file[3], file[4]))
+        for path, type, year, month, day in files:
+            instants, values = DataArchive.__readCsv(path, year, month, day, start, end)
+            for dateT, value in zip(instants, values):
+                yield Value.fromCsv(value, type, dateT)
+
+    @staticmethod
+    def betweenDatetimes(start: datetime.datetime, end: datetime.datetime, workers: int = 1) -> list[Value]:
         """
         Obtain a list of all values between two datetimes
         :param start: start datetime
         :param end: end datetime
+        :param workers: The number of threads reading CSV files, 1 reads them sequentially
         :return: lsit of Values
         """
         list = []
-        for yPath in glob.glob("dati/2*"):
-            year = int(DataArchive.__lastPathElement(yPath))
-            for mPath in glob.glob(yPath + "/*"):
-                month = int(DataArchive.__lastPathElement(mPath))
-                for dPath in glob.glob(mPath + "/*"):
-                    day = int(DataArchive.__lastPathElement(dPath))
-                    pivot = datetime.datetime.strptime(
-                        str(year).zfill(4) + "-" + str(month).zfill(2) + "-" + str(day).zfill(2), "%Y-%m-%d")
-                    if start > pivot or pivot > end:
-                        continue
-                    for elementPath in glob.glob(dPath + "/*.csv"):
-                        lep = DataArchive.__lastPathElement(elementPath)
-                        type = DataTypeArchive.Symbols(DataTypeArchive.fromFileName(lep).symbol)
-                        with open(elementPath, "r") as f:
-                            for line in f.readlines():
-                                l = line.split(",")
-                                if len(l) < 2:
-                                    continue
-                                dateT = datetime.datetime.strptime(l[0], '%Y-%m-%d %H:%M:%S')
-                                if start > dateT or end < dateT:  # It should not be necessary, but I guess
-                                    continue
-                                list.append(Value(float(l[1]), type, dateT))
+        for type, (instants, values) in DataArchive.__columns(start, end, workers).items():
+            for dateT, value in zip(instants, values):
+                list.append(Value.fromCsv(value, type, dateT))
         return list
 
     @staticmethod
@@ -276,37 +681,51 @@ class DataArchive:
         end = datetime.datetime.now()
         return DataArchive.betweenDatetimes(start, end)
 
+    @staticmethod
+    def __numericSubdirectories(path: str, maximum: int | None = None) -> list[os.DirEntry]:
+        """
+        List the numerically named subdirectories of a path, latest first, internal utility
+        :param path: The directory path
+        :param maximum: Ignore subdirectories named after a greater number
+        :return: The subdirectories, sorted by decreasing number
+        """
+        entries = [entry for entry in os.scandir(path) if entry.name.isdigit() and entry.is_dir(follow_symlinks=False)
+                   and (maximum is None or int(entry.name) <= maximum)]
+        entries.sort(key=lambda entry: int(entry.name), reverse=True)
+        return entries
+
+    @staticmethod
+    def __lastRow(path: str, tail: int = 4096) -> list[str] | None:
+        """
+        Read the last non-empty CSV row of a file by reading only its tail, internal utility
+        :param path: The CSV file path
+        :param tail: The number of trailing bytes to read
+        :return: The row fields or None if the file has no rows
+        """
+        with open(path, "rb") as f:
+            size = f.seek(0, os.SEEK_END)
+            f.seek(max(0, size - tail))
+            lines = f.read().split(b"\n")
+        for line in reversed(lines):
+            r = line.decode().split(",")
+            if len(r) >= 2:
+                return r
+        return None
+
     @staticmethod
     def latestDatetime() -> str:
         """
         Obtain a string representation (dd/mm/yyyy HH:MM:SS) of the last data instant
         :return: The string representation
         """
-        mY = int(datetime.datetime.now().strftime("%Y"))
-        mM = 12
-        mD = 31
-        tdate = ""
-        for i in range(mY):
-            yPath = "dati/" + str(mY - i)
-            if os.path.isdir(yPath):
-                for j in range(mM):
-                    mPath = yPath + "/" + str(mM - j).zfill(2)
-                    if os.path.isdir(mPath):
-                        for k in range(mD):
-                            dPath = mPath + "/" + str(mD - k).zfill(2)
-                            if os.path.isdir(dPath):
-                                tfile = open(dPath + "/temperature.csv", "r")
-                                lines = tfile.readlines()
-                                for line in lines:
-                                    r = line.split(",")
-                                    if len(r) < 2:
-                                        continue
-                                    tdate = r[0]
-                                if len(tdate) == 0:
-                                    return datetime.datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-                                else:
-                                    return datetime.datetime.strptime(tdate, "%Y-%m-%d %H:%M:%S").strftime(
-                                        "%d/%m/%Y %H:%M:%S")
+        for yEntry in DataArchive.__numericSubdirectories("dati", datetime.datetime.now().year):
+            for mEntry in DataArchive.__numericSubdirectories(yEntry.path):
+                for dEntry in DataArchive.__numericSubdirectories(mEntry.path):
+                    r = DataArchive.__lastRow(os.path.join(dEntry.path, "temperature.csv"))
+                    if r is None:
+                        return datetime.datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+                    else:
+                        return _parse_ts(r[0]).strftime("%d/%m/%Y %H:%M:%S")
 
 
 class Stats:
@@ -314,35 +733,79 @@ class Stats:
     Takes a datalist and sets a "results" resultMap attribute with a statistical value for each symbol
     """
 
-    def __init__(self, dataList: list):
+    def __init__(self, dataList: list | dict | ValueTable):
         """
         Instantiate a Stat Object
-            :param dataList: The target datalist
-        """
+            :param dataList: The target datalist, a ValueTable or the columns returned by
+            DataArchive.betweenDatetimesColumns
+        """
+        if isinstance(dataList, ValueTable):
+            dataList = dataList.columns()
+        if isinstance(dataList, dict):
+            self.results = Stats.__columnsResults(dataList)
+            return
+        # Single pass: Welford's running mean and sum of squared deviations, plus the sum of truncated values
         tempMap = {}
         resultMap = {}
         for el in dataList:
+            v = el.value
             if el.symbol not in tempMap.keys():
-                tempMap[el.symbol] = {"list": [], "iList": []}
+                tempMap[el.symbol] = {"mean": 0.0, "m2": 0.0, "iSum": 0}
             if el.symbol not in resultMap.keys():
-                resultMap[el.symbol] = {"max": Value(-10E6), "min": Value(10E6), "itemCount": 0}
+                resultMap[el.symbol] = {"max": el, "min": el, "itemCount": 0}
 
-            if el.value > resultMap[el.symbol]["max"].value:
+            if v > resultMap[el.symbol]["max"].value:
                 resultMap[el.symbol]["max"] = el
-            elif el.value < resultMap[el.symbol]["min"].value:
+            if v < resultMap[el.symbol]["min"].value:
                 resultMap[el.symbol]["min"] = el
 
-            tempMap[el.symbol]["list"].append(el.value)
-            tempMap[el.symbol]["iList"].append(int(el.value))
             resultMap[el.symbol]["itemCount"] += 1
+            t = tempMap[el.symbol]
+            d = v - t["mean"]
+            t["mean"] += d / resultMap[el.symbol]["itemCount"]
+            t["m2"] += d * (v - t["mean"])
+            t["iSum"] += int(v)
 
         for symbol in resultMap.keys():
-            resultMap[symbol]["stdev"] = statistics.stdev(tempMap[symbol]["list"])
-            resultMap[symbol]["mean"] = statistics.mean(tempMap[symbol]["list"])
-            resultMap[symbol]["mode"] = float(statistics.mean(tempMap[symbol]["iList"]))
+            n = resultMap[symbol]["itemCount"]
+            if n < 2:
+                raise statistics.StatisticsError("stdev requires at least two data points")
+            resultMap[symbol]["stdev"] = math.sqrt(tempMap[symbol]["m2"] / (n - 1))
+            resultMap[symbol]["mean"] = tempMap[symbol]["mean"]
+            resultMap[symbol]["mode"] = tempMap[symbol]["iSum"] / n
 
         self.results = resultMap
 
+    @staticmethod
+    def __columnsResults(columns: dict) -> dict:
+        """
+        Compute the results map from instants and values columns, one reduction per statistic
+        :param columns: a map from symbol to a tuple of instants and values columns
+        :return: The results map
+        """
+        resultMap = {}
+        for symbol, (instants, values) in columns.items():
+            n = len(values)
+            if n == 0:
+                continue
+            if n < 2:
+                raise statistics.StatisticsError("stdev requires at least two data points")
+            iMax = max(range(n), key=values.__getitem__)
+            iMin = min(range(n), key=values.__getitem__)
+            mean = math.fsum(values) / n
+            resultMap[symbol] = {
+                "max": Value.fromCsv(values[iMax], symbol, instants[iMax]),
+                "min": Value.fromCsv(values[iMin], symbol, instants[iMin]),
+                "itemCount": n,
+                "stdev": math.sqrt(math.fsum((v - mean) ** 2 for v in values) / (n - 1)),
+                "mean": mean,
+                "mode": math.fsum(int(v) for v in values) / n
+            }
+        return resultMap
+
+
+_fmt2 = "{:.2f}".format
+
 
 class TextGenerator:
     """
@@ -373,33 +836,50 @@ class TextGenerator:
         """
         return [DataArchive.report()]
 
+    @staticmethod
+    def __formatSummary(periodLabel: str, i: int, l: int, dta: DataType, ssm: dict) -> str:
+        """
+        Format the summary excerpt of a single datatype
+        :param periodLabel: The italian label of the period, e.g. "di oggi"
+        :param i: The index of the excerpt
+        :param l: The number of excerpts
+        :param dta: The DataType
+        :param ssm: The Stats results of the DataType
+        :return: The excerpt
+        """
+        u = dta.unit
+        return "\n".join([
+            f"({i + 1}/{l}) Dati {periodLabel}",
+            f"---{dta.italianName}---",
+            f"Media: {_fmt2(ssm['mean'])} {u}",
+            f"Moda: {_fmt2(ssm['mode'])} {u}",
+            f"Massimo: {_fmt2(ssm['max'].value)} {u} ({ssm['max'].instant.strftime('%d/%m/%Y %H:%M:%S')}) ",
+            f"Minimo: {_fmt2(ssm['min'].value)} {u} ({ssm['min'].instant.strftime('%d/%m/%Y %H:%M:%S')}) ",
+            f"Deviazione Standard: {_fmt2(ssm['stdev'])} {u}",
+            f"Moda: {_fmt2(ssm['mean'])} {u}",
+            f"Numero di rilevazioni: {_fmt2(ssm['itemCount'])}"
+        ])
+
+    @staticmethod
+    def __summaries(periodLabel: str, dataList: list[Value]) -> list[str]:
+        """
+        Summary excerpts of a datalist, one for each datatype
+        :param periodLabel: The italian label of the period, e.g. "di oggi"
+        :param dataList: The target datalist
+        :return: array of excerpts
+        """
+        s = Stats(dataList).results
+        l = len(s)
+        return [TextGenerator.__formatSummary(periodLabel, i, l, DataTypeArchive.fromSymbol(symbol.value), ssm)
+                for i, (symbol, ssm) in enumerate(s.items())]
+
     @staticmethod
     def week() -> list[str]:
         """
         Current week summary
         :return: array of excerpts
         """
-        i = 0
-        list = []
-        s = Stats(DataArchive.week()).results
-        l = len(s.keys())
-        for symbol in s.keys():
-            dta = DataTypeArchive.fromSymbol(symbol.value)
-            ssm = s[symbol]
-            list.append(
-                "(" + str(i + 1) + "/" + str(
-                    l) + ") Dati di questa settimana\n---" + dta.italianName + "---\nMedia: " + (
-                    "{:.2f}".format(ssm["mean"])) + " " + dta.unit + "\nModa: " + (
-                    "{:.2f}".format(ssm["mode"])) + " " + dta.unit + "\nMassimo: " + (
-                    "{:.2f}".format(ssm["max"].value)) + " " + dta.unit + " (" + ssm["max"].instant.strftime(
-                    "%d/%m/%Y %H:%M:%S") + ") " + "\nMinimo: " + (
-                    "{:.2f}".format(ssm["min"].value)) + " " + dta.unit + " (" + ssm["min"].instant.strftime(
-                    "%d/%m/%Y %H:%M:%S") + ") " + "\nDeviazione Standard: " + (
-                    "{:.2f}".format(ssm["stdev"])) + " " + dta.unit + "\nModa: " + (
-                    "{:.2f}".format(ssm["mean"])) + " " + dta.unit + "\nNumero di rilevazioni: " + (
-                    "{:.2f}".format(ssm["itemCount"])))
-            i += 1
-        return list
+        return TextGenerator.__summaries("di questa settimana", DataArchive.week())
 
     @staticmethod
     def month() -> list[str]:
@@ -407,26 +887,7 @@ class TextGenerator:
         Current month summary
         :return: array of excerpts
         """
-        i = 0
-        list = []
-        s = Stats(DataArchive.month()).results
-        l = len(s.keys())
-        for symbol in s.keys():
-            dta = DataTypeArchive.fromSymbol(symbol.value)
-            ssm = s[symbol]
-            list.append(
-                "(" + str(i + 1) + "/" + str(l) + ") Dati di questo mese\n---" + dta.italianName + "---\nMedia: " + (
-                    "{:.2f}".format(ssm["mean"])) + " " + dta.unit + "\nModa: " + (
-                    "{:.2f}".format(ssm["mode"])) + " " + dta.unit + "\nMassimo: " + (
-                    "{:.2f}".format(ssm["max"].value)) + " " + dta.unit + " (" + ssm["max"].instant.strftime(
-                    "%d/%m/%Y %H:%M:%S") + ") " + "\nMinimo: " + (
-                    "{:.2f}".format(ssm["min"].value)) + " " + dta.unit + " (" + ssm["min"].instant.strftime(
-                    "%d/%m/%Y %H:%M:%S") + ") " + "\nDeviazione Standard: " + (
-                    "{:.2f}".format(ssm["stdev"])) + " " + dta.unit + "\nModa: " + (
-                    "{:.2f}".format(ssm["mean"])) + " " + dta.unit + "\nNumero di rilevazioni: " + (
-                    "{:.2f}".format(ssm["itemCount"])))
-            i += 1
-        return list
+        return TextGenerator.__summaries("di questo mese", DataArchive.month())
 
     @staticmethod
     def day() -> list[str]:
@@ -434,23 +895,4 @@ class TextGenerator:
         Current day summary
         :return: array of excerpts
         """
-        i = 0
-        list = []
-        s = Stats(DataArchive.day()).results
-        l = len(s.keys())
-        for symbol in s.keys():
-            dta = DataTypeArchive.fromSymbol(symbol.value)
-            ssm = s[symbol]
-            list.append(
-                "(" + str(i + 1) + "/" + str(l) + ") Dati di oggi\n---" + dta.italianName + "---\nMedia: " + (
-                    "{:.2f}".format(ssm["mean"])) + " " + dta.unit + "\nModa: " + (
-                    "{:.2f}".format(ssm["mode"])) + " " + dta.unit + "\nMassimo: " + (
-                    "{:.2f}".format(ssm["max"].value)) + " " + dta.unit + " (" + ssm["max"].instant.strftime(
-                    "%d/%m/%Y %H:%M:%S") + ") " + "\nMinimo: " + (
-                    "{:.2f}".format(ssm["min"].value)) + " " + dta.unit + " (" + ssm["min"].instant.strftime(
-                    "%d/%m/%Y %H:%M:%S") + ") " + dta.unit + "\nDeviazione Standard: " + (
-                    "{:.2f}".format(ssm["stdev"])) + " " + dta.unit + "\nModa: " + (
-                    "{:.2f}".format(ssm["mean"])) + " " + dta.unit + "\nNumero di rilevazioni: " + (
-                    "{:.2f}".format(ssm["itemCount"])))
-            i += 1
-        return list
+        return TextGenerator.__summaries("di oggi", DataArchive.day())